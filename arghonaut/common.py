@@ -21,15 +21,10 @@ def read_lines(file_path: str) -> list[str]:
 def is_chr(char: Optional[int]) -> bool:
     """
     Can the given character be cast to a chr?
-    """
-    if char is None:
-        return False
 
-    try:
-        chr(char)
-        return True
-    except ValueError:
-        return False
+    chr accepts exactly the Unicode code points, 0 through 0x10FFFF.
+    """
+    return char is not None and 0 <= char <= 0x10FFFF
 
 
 def is_printable(char: int, long: bool = False) -> bool:
@@ -39,18 +34,11 @@ def is_printable(char: int, long: bool = False) -> bool:
     Newlines and tabs are not included. In long output mode, spaces are not
     included due to ambiguity in output.
     """
-    if long and char == ord(" "):
-        return False
-    return 32 <= char <= 126
+    return (33 if long else 32) <= char <= 126
 
 
-def to_printable(char: int, long: bool = False) -> str:
-    """
-    Converts the given character to a more readable/printable representation.
-
-    In long output mode, this may be more than one character long. Printable
-    characters are returned as-is.
-    """
+def _to_printable(char: int, long: bool = False) -> str:
+    """Compute the printable representation of any character."""
     escape = ""
     if is_printable(char):
         return chr(char)
@@ -72,3 +60,24 @@ def to_printable(char: int, long: bool = False) -> str:
 
     # Append a backslash to escape sequences in long output mode
     return "\\" + escape if long else escape
+
+
+# Printable representations of all byte values, in short and long modes
+_PRINTABLE_FORMS = tuple(_to_printable(char) for char in range(256))
+_PRINTABLE_FORMS_LONG = tuple(
+    _to_printable(char, long=True) for char in range(256)
+)
+
+
+def to_printable(char: int, long: bool = False) -> str:
+    """
+    Converts the given character to a more readable/printable representation.
+
+    In long output mode, this may be more than one character long. Printable
+    characters are returned as-is. Byte values are looked up in a table.
+    """
+    if 0 <= char < 256:
+        if long:
+            return _PRINTABLE_FORMS_LONG[char]
+        return _PRINTABLE_FORMS[char]
+    return _to_printable(char, long)
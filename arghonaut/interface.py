@@ -1,8 +1,12 @@
 """The curses interface to the Argh interpreter and surrounding setup."""
 
-from copy import deepcopy
+from array import array
 import curses
+from curses import ERR
+from curses.ascii import EOT, ESC, LF
 import sys
+import time
+from typing import Optional
 
 from .common import is_chr, is_printable, to_printable
 from .interpreter import ArghInterpreter, COLUMNS
@@ -62,15 +66,25 @@ COLOR_DICT: dict[str, int] = {
 
 BOLD_CHARS = "HJKLgGxXq"
 
+# Symbols compared against while rendering, as integer character codes
+_SPACE = ord(" ")
+_COMMENT = ord("#")
+
+# Minimum time between renders while executing continuously, in seconds
+FRAME_TIME = 1 / 60
+# Steps executed between checks of the frame timer
+STEPS_PER_CHECK = 1000
+
 
 class ArghInterface:
     """A curses interface to an Argh interpreter instance."""
 
     interpreter: ArghInterpreter
     syntax: bool
-    code: list[list[int]]
+    code: list[array]
     insert: bool
     auto: bool
+    continuing: bool
     ex: int
     ey: int
     _render_start: int
@@ -78,16 +92,23 @@ class ArghInterface:
     _old_y: int
     _old_ex: int
     _old_ey: int
+    _pad: Optional[curses.window]
+    _rendered_rows: dict[int, array]
+    _rendered_status: Optional[tuple]
+    _status_rows: tuple[int, int]
+    _clear: bool
+    _bottom_rows_cache: Optional[int]
 
     def __init__(self, interpreter: ArghInterpreter, syntax: bool = True):
         self.interpreter = interpreter
         self.syntax = syntax
 
         # Original code buffer
-        self.code = deepcopy(self.interpreter.code)
+        self.code = [row[:] for row in self.interpreter.code]
         # Input state
         self.insert = False
         self.auto = False
+        self.continuing = False
         # Cursor
         self.ex = 0
         self.ey = 0
@@ -98,6 +119,17 @@ class ArghInterface:
         self._old_y = self.y
         self._old_ex = self.ex
         self._old_ey = self.ey
+        # Off-screen pad holding all code, created on the first render
+        self._pad = None
+        # What is currently drawn, to only repaint what changed
+        self._rendered_rows = {}
+        self._rendered_status = None
+        # Range of screen rows last covered by the status output
+        self._status_rows = (0, 0)
+        # Whether to clear and fully repaint the screen on the next render
+        self._clear = False
+        # Size of the bottom portion of the output, computed once per render
+        self._bottom_rows_cache = None
 
     @property
     def x(self) -> int:
@@ -138,28 +170,27 @@ class ArghInterface:
     @property
     def _stack_text_length(self) -> int:
         """The string length of the stack symbols in their printable form."""
-        length = 0
-        for char in self.interpreter.stack:
-            if is_printable(char, long=True):
-                length += 1
-            else:
-                printable = to_printable(char, long=True)
-                length += len(printable)
-        return length
+        stack = self.interpreter.stack
+        return sum(len(to_printable(char, long=True)) for char in stack)
 
     def _bottom_rows(self, stdscr: curses.window) -> int:
         """
         The number of rows needed to display the bottom portion of the output.
 
-        This includes stdout, stack, status, and padding.
+        This includes stdout, stack, status, and padding. Only computed once
+        per render, since it requires walking all of stdout and the stack.
         """
+        if self._bottom_rows_cache is not None:
+            return self._bottom_rows_cache
+
         stdout_list = self.interpreter.stdout.split("\n")
         stdout_lines = len(stdout_list)
         max_x = stdscr.getmaxyx()[1]
         for line in stdout_list:
             stdout_lines += len(line) // max_x
         stack_lines = self._stack_text_length // max_x
-        return 9 + stdout_lines + stack_lines
+        self._bottom_rows_cache = 9 + stdout_lines + stack_lines
+        return self._bottom_rows_cache
 
     def _render_end(self, stdscr: curses.window) -> int:
         """Return the last (lowest) line to render."""
@@ -175,45 +206,23 @@ class ArghInterface:
         """Return the number of lines of code to be rendered."""
         return self._render_end(stdscr) - self._render_start
 
-    def _render_char(
-        self, stdscr: curses.window, x: int, y: int, highlight: bool = False
-    ) -> None:
+    def _cell_attr(self, char: int, commented: bool, highlight: bool) -> int:
         """
-        Render the character at the given code coordinates.
+        Return the curses attributes used to render the given symbol.
 
-        Adjusts for render offsets.
+        A symbol is commented if a comment symbol precedes it in its row.
         """
-        # Don't render if out of bounds
-        ry = y - self._render_start
-        if ry < 0 or y > self._render_end(stdscr):
-            return
-
-        # Don't render spaces unless they're highlighted
-        char = self.interpreter.code[y][x]
-        if char == ord(" "):
-            if highlight:
-                attr = curses.color_pair(COLOR_DEFAULT)
-                attr |= curses.A_REVERSE
-                stdscr.addstr(ry, x, " ", attr)
-            return
-
         # Normal printable character
         if is_printable(char):
             char_cast = chr(char)
             color_pair = COLOR_DEFAULT
 
-            if self.syntax:
+            if self.syntax and char != _SPACE:
                 color_pair = COLOR_DICT.get(char_cast, COLOR_DEFAULT)
 
                 # Check if this character is commented (non-standard)
-                if color_pair != COLOR_COMMENT:
-                    for symbol in self.interpreter.code[y][:x]:
-                        if (
-                            is_printable(symbol)
-                            and COLOR_DICT.get(chr(symbol)) == COLOR_COMMENT
-                        ):
-                            color_pair = COLOR_COMMENT
-                            break
+                if commented:
+                    color_pair = COLOR_COMMENT
 
             attr = curses.color_pair(color_pair)
 
@@ -225,90 +234,287 @@ class ArghInterface:
             ):
                 attr |= curses.A_BOLD
 
-            # Invert foreground and background colors on highlight (like vim)
-            if highlight:
-                attr |= curses.A_REVERSE
-
-            stdscr.addstr(ry, x, char_cast, attr)
-
         # Special character
         else:
-            color_pair = COLOR_SPECIAL
-            attr = curses.color_pair(color_pair)
-            # Invert foreground and background colors on highlight (like vim)
-            if highlight:
-                attr |= curses.A_REVERSE
-            stdscr.addstr(
-                ry, x, to_printable(char), curses.color_pair(color_pair)
-            )
+            attr = curses.color_pair(COLOR_SPECIAL)
+
+        # Invert foreground and background colors on highlight (like vim)
+        if highlight:
+            attr |= curses.A_REVERSE
+
+        return attr
+
+    def _code_pad(self) -> curses.window:
+        """Return the pad holding all code, creating or resizing it."""
+        code = self.interpreter.code
+        if self._pad is None:
+            self._pad = curses.newpad(len(code), COLUMNS + 1)
+        elif self._pad.getmaxyx()[0] < len(code):
+            self._pad.resize(len(code), COLUMNS + 1)
+        return self._pad
+
+    def _render_char(self, x: int, y: int, highlight: bool = False) -> None:
+        """Render the character at the given code coordinates to the pad."""
+        row = self.interpreter.code[y]
+        char = row[x]
+        commented = _COMMENT in row[:x]
+        attr = self._cell_attr(char, commented, highlight)
+        self._code_pad().addstr(y, x, to_printable(char), attr)
+
+    def _render_row(
+        self, y: int, highlighted: tuple[tuple[int, int], ...]
+    ) -> None:
+        """
+        Render every character in the given row of code to the pad.
+
+        Consecutive characters with the same attributes are drawn with a
+        single call to addstr.
+        """
+        pad = self._code_pad()
+        commented = False
+        run: list[str] = []
+        run_x = 0
+        run_attr = curses.A_NORMAL
+        for x, char in enumerate(self.interpreter.code[y]):
+            attr = self._cell_attr(char, commented, (x, y) in highlighted)
+            if attr != run_attr and run:
+                pad.addstr(y, run_x, "".join(run), run_attr)
+                run = []
+                run_x = x
+            run_attr = attr
+            run.append(to_printable(char))
+            if char == _COMMENT:
+                commented = True
+        if run:
+            pad.addstr(y, run_x, "".join(run), run_attr)
+
+    def _render_code(
+        self, stdscr: curses.window, old_cells: set[tuple[int, int]]
+    ) -> None:
+        """
+        Render the visible code to the pad, repainting only what changed.
+
+        The pad holds every line of code, so scrolling needs no repainting.
+        Visible rows whose contents differ from what is drawn in the pad are
+        redrawn in full. Otherwise, only the given cells (where the
+        instruction pointer and editing cursor were last drawn) and their new
+        positions are redrawn.
+        """
+        code = self.interpreter.code
+        self._code_pad()
+
+        # Forget rows that a hard reset removed, so they are redrawn if added
+        if max(self._rendered_rows, default=-1) >= len(code):
+            self._rendered_rows = {
+                y: row
+                for y, row in self._rendered_rows.items()
+                if y < len(code)
+            }
+
+        highlighted = ((self.x, self.y), (self.ex, self.ey))
+        for y in range(self._render_start, self._render_end(stdscr)):
+            if code[y] != self._rendered_rows.get(y):
+                self._render_row(y, highlighted)
+                self._rendered_rows[y] = code[y][:]
+
+        for x, y in old_cells.union(highlighted):
+            if y in self._rendered_rows:
+                self._render_char(x, y, (x, y) in highlighted)
 
     def render(self, stdscr: curses.window) -> None:
         """
         Render the code and status output.
+
+        Only the parts of the screen that changed since the last render are
+        redrawn. Updates are staged with noutrefresh; call curses.doupdate
+        afterwards to write them to the terminal at once.
         """
+        self._bottom_rows_cache = None
+        if self._clear:
+            stdscr.clear()
+            self._rendered_rows = {}
+            self._rendered_status = None
+            self._status_rows = (0, 0)
+            self._clear = False
+        old_cells = {(self._old_x, self._old_y), (self._old_ex, self._old_ey)}
         self._update_render_range(stdscr)
+        self._render_code(stdscr, old_cells)
+        self._render_status(stdscr)
+
+        # The pad is staged last so that it is drawn over the main window
+        stdscr.noutrefresh()
+        height = self._render_height(stdscr)
+        if height > 0:
+            self._code_pad().noutrefresh(
+                self._render_start,
+                0,
+                0,
+                0,
+                height - 1,
+                min(COLUMNS, stdscr.getmaxyx()[1]) - 1,
+            )
 
-        # Render all visible code
-        ry = 0
-        for y in range(self._render_start, self._render_end(stdscr)):
-            for x in range(len(self.interpreter.code[y])):
-                # Highlight if instruction pointer or editing cursor is here
-                highlight = (x, y) in ((self.x, self.y), (self.ex, self.ey))
-                self._render_char(stdscr, x, y, highlight)
-            ry += 1
+    def _render_status_line(
+        self,
+        stdscr: curses.window,
+        ry: int,
+        text: str = "",
+        attr: int = curses.A_NORMAL,
+    ) -> None:
+        """Render a line of status output, blanking the rest of its row."""
+        if ry < stdscr.getmaxyx()[0]:
+            self._render_status_text(stdscr, ry, 0, text, attr)
+            stdscr.clrtoeol()
+
+    def _render_status_text(
+        self,
+        stdscr: curses.window,
+        ry: int,
+        rx: int,
+        text: str,
+        attr: int = curses.A_NORMAL,
+    ) -> None:
+        """
+        Render status text at the given screen coordinates, wrapping it.
 
-        max_x = stdscr.getmaxyx()[1]
+        Text is cut off at the bottom of the screen. Curses draws what fits
+        and then errors, which is ignored.
+        """
+        max_y, max_x = stdscr.getmaxyx()
+        room = (max_y - ry) * max_x - rx
+        if room > 0:
+            try:
+                stdscr.addstr(ry, rx, text[:room], attr)
+            except curses.error:
+                pass
+
+    def _render_status(self, stdscr: curses.window) -> None:
+        """
+        Render the output, stack, and status message below the code.
+
+        Nothing is redrawn if none of it changed since the last render. Lines
+        are drawn over the previous status output, and only rows it covered
+        that are no longer used are blanked.
+        """
+        start = max(0, self._render_height(stdscr))
+        max_y, max_x = stdscr.getmaxyx()
+
+        # Only redraw the status output if any of it changed
+        status = (
+            start,
+            max_x,
+            self.interpreter.stdout,
+            tuple(self.interpreter.stack),
+            self.interpreter.needs_input,
+            self.interpreter.done,
+            self.interpreter.error,
+        )
+        if status == self._rendered_status:
+            return
+        self._rendered_status = status
 
         # Standard output
+        ry = start
+        self._render_status_line(stdscr, ry)
         ry += 1
-        stdscr.addstr(ry, 0, "Output:", curses.color_pair(COLOR_COMMENT))
+        self._render_status_line(
+            stdscr, ry, "Output:", curses.color_pair(COLOR_COMMENT)
+        )
         ry += 1
-        stdout_list = self.interpreter.stdout.split("\n")
-        for i in range(len(stdout_list)):
-            stdscr.addstr(ry, 0, stdout_list[i])
-            ry += len(stdout_list[i]) // max_x + 1
+        for line in self.interpreter.stdout.split("\n"):
+            self._render_status_line(stdscr, ry, line)
+            ry += len(line) // max_x + 1
 
         # Stack, using printable characters
+        # Consecutive symbols with the same attributes are drawn together
+        self._render_status_line(stdscr, ry)
         ry += 1
-        stdscr.addstr(ry, 0, "Stack:", curses.color_pair(COLOR_COMMENT))
+        self._render_status_line(
+            stdscr, ry, "Stack:", curses.color_pair(COLOR_COMMENT)
+        )
         ry += 1
+        if ry < max_y:
+            stdscr.move(ry, 0)
         x = 0
-        for i in range(len(self.interpreter.stack)):
-            char = self.interpreter.stack[i]
+        run: list[str] = []
+        run_x = 0
+        run_attr = curses.A_NORMAL
+        for char in self.interpreter.stack:
             if is_printable(char, long=True):
-                stdscr.addstr(ry + (x // max_x), x % max_x, chr(char))
-                x += 1
+                printable = chr(char)
+                attr = curses.A_NORMAL
             else:
                 printable = to_printable(char, long=True)
-                stdscr.addstr(
-                    ry + (x // max_x),
-                    x % max_x,
-                    printable,
-                    curses.color_pair(COLOR_SPECIAL),
+                attr = curses.color_pair(COLOR_SPECIAL)
+            if attr != run_attr and run:
+                self._render_status_text(
+                    stdscr,
+                    ry + (run_x // max_x),
+                    run_x % max_x,
+                    "".join(run),
+                    run_attr,
                 )
-                x += len(printable)
+                run = []
+                run_x = x
+            run_attr = attr
+            run.append(printable)
+            x += len(printable)
+        if run:
+            self._render_status_text(
+                stdscr,
+                ry + (run_x // max_x),
+                run_x % max_x,
+                "".join(run),
+                run_attr,
+            )
+        if ry < max_y:
+            stdscr.clrtoeol()
 
         # Status message
-        ry += x // max_x
-        ry += 2
+        ry += x // max_x + 1
+        self._render_status_line(stdscr, ry)
+        ry += 1
         if self.interpreter.needs_input:
-            stdscr.addstr(
+            self._render_status_line(
+                stdscr,
                 ry,
-                0,
                 "Type a character to input.",
                 curses.color_pair(COLOR_INPUT),
             )
+            ry += 1
         elif self.interpreter.done:
-            stdscr.addstr(ry, 0, "Done!", curses.color_pair(COLOR_DONE))
+            self._render_status_line(
+                stdscr, ry, "Done!", curses.color_pair(COLOR_DONE)
+            )
+            ry += 1
+            self._render_status_line(stdscr, ry, "Press Q or Escape to exit.")
             ry += 1
-            stdscr.addstr(ry, 0, "Press Q or Escape to exit.")
         elif self.interpreter.error:
-            stdscr.addstr(ry, 0, "Argh!", curses.color_pair(COLOR_ERROR))
+            self._render_status_line(
+                stdscr, ry, "Argh!", curses.color_pair(COLOR_ERROR)
+            )
+            ry += 1
+            self._render_status_line(stdscr, ry, self.interpreter.error)
             ry += 1
-            stdscr.addstr(ry, 0, self.interpreter.error)
+
+        # Blank rows the previous status output covered but this one doesn't
+        old_start, old_end = self._status_rows
+        for old_ry in range(old_start, min(start, max_y)):
+            stdscr.move(old_ry, 0)
+            stdscr.clrtoeol()
+        if ry < min(old_end, max_y):
+            stdscr.move(ry, 0)
+            stdscr.clrtobot()
+        self._status_rows = (start, ry)
 
     def handle_input(self, input_code: int) -> None:
-        """Handle a single curses input code."""
+        """
+        Handle a single curses input code.
+
+        Continuing execution ("c") only sets the continuing flag, since
+        rendering progress needs the screen; main then runs
+        continue_execution.
+        """
         # In insert mode, always insert the next typed character
         if self.insert:
             self.interpreter.put(input_code, self.ex, self.ey)
@@ -339,8 +545,8 @@ class ArghInterface:
         # Step
         elif (
             input_char == "."
-            or input_code == curses.ascii.LF
-            or (self.auto and input_code == curses.ERR)
+            or input_code == LF
+            or (self.auto and input_code == ERR)
         ):
             self.interpreter.step()
 
@@ -366,10 +572,7 @@ class ArghInterface:
 
         # Jump the instruction pointer to the cursor
         elif input_char == "g":
-            self.interpreter.x, self.interpreter.y = (
-                self.ex,
-                self.ey,
-            )
+            self.interpreter.goto(self.ex, self.ey)
 
         # Enter insert mode
         elif input_char == "i":
@@ -379,54 +582,77 @@ class ArghInterface:
         elif input_char == "o":
             self.interpreter.new_line()
 
-        # Execute until blocked (no delay)
+        # Execute until blocked (no delay), which main does after this returns
         elif input_char == "c":
-            while not self.interpreter.blocked:
-                self.interpreter.step()
+            self.continuing = True
 
         # Reset state (excluding unsaved code changes)
         elif input_char == "r":
             self.interpreter.reset()
+            self._clear = True
 
         # Reset program (including unsaved code changes)
         elif input_char == "n":
-            self.interpreter.code = self.code
-            self.interpreter.reset()
+            self.interpreter.hard_reset(self.code)
+            self._clear = True
 
         # Save current code changes to program state
         # Does not modify source file
         elif input_char == "s":
-            self.code = deepcopy(self.interpreter.code)
+            self.code = [row[:] for row in self.interpreter.code]
 
         # Quit
         elif (
             input_char == "q"
-            or input_code == curses.ascii.ESC
-            or input_code == curses.ascii.EOT
+            or input_code == ESC
+            or input_code == EOT
         ):
             sys.exit(0)
 
     def main(self, stdscr: curses.window) -> None:
         """Run a main loop using this interface on the given screen."""
+        # Resolved once, since the loop runs for every key and auto step
+        render = self.render
+        doupdate = curses.doupdate
+        getch = stdscr.getch
+        handle_input = self.handle_input
+
         input_code = None
         while True:
-            self.render(stdscr)
-            stdscr.refresh()
+            render(stdscr)
+            doupdate()
 
             try:
-                input_code = stdscr.getch()
+                input_code = getch()
                 # Block for input if auto mode is enabled
                 while (
                     self.interpreter.needs_input
                     and self.auto
-                    and input_code == curses.ERR
+                    and input_code == ERR
                 ):
-                    input_code = stdscr.getch()
+                    input_code = getch()
             except KeyboardInterrupt:
                 sys.exit(1)
 
-            stdscr.erase()
-            self.handle_input(input_code)
+            handle_input(input_code)
+            if self.continuing:
+                self.continue_execution(stdscr)
+
+    def continue_execution(self, stdscr: curses.window) -> None:
+        """
+        Execute until blocked, rendering progress at most once per frame.
+
+        The final state is left to be rendered by the caller.
+        """
+        last_render = time.monotonic()
+        while not self.interpreter.blocked:
+            self.interpreter.run(max_steps=STEPS_PER_CHECK)
+            now = time.monotonic()
+            if now - last_render >= FRAME_TIME:
+                self.render(stdscr)
+                curses.doupdate()
+                last_render = now
+        self.continuing = False
 
 
 def init_color_pairs() -> None:
@@ -1,15 +1,64 @@
 """The Argh interpreter and its program state."""
 
+from array import array
+from bisect import bisect_left, bisect_right
 from collections import deque
 from curses.ascii import EOT
-from typing import Optional
+from itertools import count
+from typing import Callable, Optional
 
-from .common import is_chr, is_printable, to_printable
+from .common import is_chr, to_printable
 
 
 # Maximum columns; strict requirement of Argh! and Aargh!
 COLUMNS = 80
 
+# Symbols compared against at runtime, as integer character codes
+_QUIT = ord("q")
+_BANG = ord("!")
+_SPACE = ord(" ")
+
+# A row of nothing but spaces, copied for each new line
+_BLANK_ROW = array("q", [_SPACE]) * COLUMNS
+
+# Number of symbol codes covered by the dispatch table (all of ASCII)
+_DISPATCH_SIZE = 128
+
+# Directions of the instruction pointer
+DIRECTION_NONE = 0
+DIRECTION_LEFT = 1
+DIRECTION_RIGHT = 2
+DIRECTION_UP = 3
+DIRECTION_DOWN = 4
+
+# The direction set by each movement symbol, executed inline by run()
+_MOVEMENT = {
+    ord("h"): DIRECTION_LEFT,
+    ord("l"): DIRECTION_RIGHT,
+    ord("k"): DIRECTION_UP,
+    ord("j"): DIRECTION_DOWN,
+}
+
+# Components of each direction, indexed by direction
+DX = (0, -1, 1, 0, 0)
+DY = (0, 0, 0, -1, 1)
+
+# The result of rotating each direction 90 degrees, indexed by direction
+CLOCKWISE = (
+    DIRECTION_NONE,
+    DIRECTION_UP,
+    DIRECTION_DOWN,
+    DIRECTION_RIGHT,
+    DIRECTION_LEFT,
+)
+COUNTERCLOCKWISE = (
+    DIRECTION_NONE,
+    DIRECTION_DOWN,
+    DIRECTION_UP,
+    DIRECTION_LEFT,
+    DIRECTION_RIGHT,
+)
+
 
 class ArghInterpreter:
     """
@@ -18,72 +67,130 @@ class ArghInterpreter:
     Also tracks some editor information for ease of rendering.
     """
 
-    code: list[list[int]]
+    # Fixed attribute slots, for faster access than an instance dictionary
+    __slots__ = (
+        "code",
+        "x",
+        "y",
+        "direction",
+        "instruction",
+        "stack",
+        "_stdout_parts",
+        "_stdout_cache",
+        "stdin",
+        "needs_input",
+        "error",
+        "_batch",
+        "_dispatch",
+        "_column_symbols",
+    )
+
+    code: list[array]
     x: int
     y: int
-    dx: int
-    dy: int
+    direction: int
+    instruction: int
     stack: list[int]
-    stdout: str
+    _stdout_parts: list[str]
+    _stdout_cache: Optional[str]
     stdin: deque[int]
     needs_input: bool
     error: Optional[str]
+    _batch: bool
+    _dispatch: list[Optional[Callable[[], None]]]
+    _column_symbols: dict[int, dict[int, list[int]]]
 
     def __init__(self, code: list[str]):
         """
         Instantiate a new program with the given code.
 
-        Code is converted into a 2D list of integer character codes.
+        Code is converted into a list of rows, each a contiguous array of
+        COLUMNS signed 64-bit integer character codes. The stack holds
+        arbitrarily large integers, since arithmetic on it is unbounded.
         """
-        self.code = []
-        for y in range(len(code)):
-            self.code.append([])
-            for x in range(COLUMNS):
-                if x < len(code[y]):
-                    self.code[y].append(ord(code[y][x]))
-                else:
-                    self.code[y].append(ord(" "))
-
-        # Instruction pointer
+        self.code = [
+            array("q", map(ord, line[:COLUMNS].ljust(COLUMNS)))
+            for line in code
+        ]
+        # Rows holding each symbol in each column, found by vertical jumps
+        self._column_symbols = {}
+
+        # Instruction pointer and the symbol under it
         self.x = 0
         self.y = 0
+        self.instruction = self.code[0][0]
         # Direction
-        self.dx = 0
-        self.dy = 0
+        self.direction = DIRECTION_NONE
         # Stack and I/O
         self.stack = []
-        self.stdout = ""
+        self._stdout_parts = []
+        self._stdout_cache = ""
         self.stdin = deque()
         self.needs_input = False
         # Diagnostic and rendering information
         self.error = None
+        # Whether the current step prints to the system's standard output
+        self._batch = False
+        # Bound handler for each instruction, indexed by symbol
+        self._dispatch = [None] * _DISPATCH_SIZE
+        for symbol, handler in self._DISPATCH.items():
+            self._dispatch[symbol] = handler.__get__(self)
 
     def reset(self) -> None:
         """
         Reset all values of the program state other than code.
         """
-        # Instruction pointer
+        # Instruction pointer and the symbol under it
         self.x = 0
         self.y = 0
+        self.instruction = self.code[0][0]
         # Direction
-        self.dx = 0
-        self.dy = 0
+        self.direction = DIRECTION_NONE
         # Stack and I/O
         self.stack = []
-        self.stdout = ""
+        self._stdout_parts = []
+        self._stdout_cache = ""
         self.stdin = deque()
         self.needs_input = False
         self.error = None
 
+    def hard_reset(self, code: list[array]) -> None:
+        """
+        Reset all values of the program state, replacing the code.
+
+        Each row of the given code is copied, so later edits to the program
+        do not affect it.
+        """
+        self.code = [row[:] for row in code]
+        self._column_symbols = {}
+        self.reset()
+
+    @property
+    def stdout(self) -> str:
+        """
+        Everything the program has printed so far.
+
+        Printed characters are buffered and only joined when this is read.
+        """
+        if self._stdout_cache is None:
+            self._stdout_cache = "".join(self._stdout_parts)
+            self._stdout_parts = [self._stdout_cache]
+        return self._stdout_cache
+
+    @property
+    def dx(self) -> int:
+        """The horizontal component of the current direction."""
+        return DX[self.direction]
+
     @property
-    def instruction(self) -> int:
-        """The symbol at the instruction pointer."""
-        return self.code[self.y][self.x]
+    def dy(self) -> int:
+        """The vertical component of the current direction."""
+        return DY[self.direction]
 
     @property
     def done(self) -> bool:
         """True if the program has finished executing normally."""
-        return self.instruction == ord("q")
+        return self.instruction == _QUIT
 
     @property
     def blocked(self) -> bool:
@@ -92,7 +199,11 @@ class ArghInterpreter:
 
         May be due to proper or improper termination or an input instruction.
         """
-        return self.done or self.error is not None or self.needs_input
+        return (
+            self.instruction == _QUIT
+            or self.error is not None
+            or self.needs_input
+        )
 
     def get(self, x: int, y: int) -> int:
         """
@@ -103,30 +214,49 @@ class ArghInterpreter:
         assert self.is_valid(x, y)
         return self.code[y][x]
 
-    def _get_above(self) -> int:
-        """Get the symbol in the cell above the instruction pointer."""
-        return self.get(self.x, self.y - 1)
-
-    def _get_below(self) -> int:
-        """Get the symbol in the cell below the instruction pointer."""
-        return self.get(self.x, self.y + 1)
-
     def put(self, symbol: int, x: int, y: int) -> None:
         """Put the given symbol at the given coordinates, if they are valid."""
         if self.is_valid(x, y):
+            self._store(symbol, x, y)
+
+    def _store(self, symbol: int, x: int, y: int) -> None:
+        """
+        Put the given symbol at the given coordinates, which are valid.
+
+        Errors if the symbol does not fit in a signed 64-bit cell.
+        """
+        replaced = self.code[y][x]
+        try:
             self.code[y][x] = symbol
+        except OverflowError:
+            self.error = "tried to put a value too large for a cell"
+            return
 
-    def _put_above(self, symbol: int) -> None:
-        """Put the given symbol in the cell above the instruction pointer."""
-        self.put(symbol, self.x, self.y - 1)
+        # Forget where the replaced and new symbols are in this column
+        column = self._column_symbols.get(x)
+        if column:
+            column.pop(replaced, None)
+            column.pop(symbol, None)
+        if x == self.x and y == self.y:
+            self.instruction = symbol
 
-    def _put_below(self, symbol: int) -> None:
-        """Put the given symbol in the cell below the instruction pointer."""
-        self.put(symbol, self.x, self.y + 1)
+    def goto(self, x: int, y: int) -> None:
+        """
+        Move the instruction pointer to the given valid coordinates.
+
+        To be called externally.
+        """
+        self.x = x
+        self.y = y
+        self.instruction = self.code[y][x]
 
     def is_valid(self, x: int, y: int) -> bool:
-        """Are the given cell coordinates in the bounds of the program?"""
-        return 0 <= y < len(self.code) and 0 <= x < len(self.code[y])
+        """
+        Are the given cell coordinates in the bounds of the program?
+
+        Every row is exactly COLUMNS wide, so rows need not be measured.
+        """
+        return 0 <= x < COLUMNS and 0 <= y < len(self.code)
 
     def _move(self) -> bool:
         """
@@ -136,13 +266,16 @@ class ArghInterpreter:
         bounds, or if no direction was given (can only occur if this is the
         first symbol in the program).
         """
-        if self.dx == 0 and self.dy == 0:
+        if self.direction == DIRECTION_NONE:
             self.error = "can't move; no direction specified"
             return False
 
-        if self.is_valid(self.x + self.dx, self.y + self.dy):
-            self.x += self.dx
-            self.y += self.dy
+        x = self.x + DX[self.direction]
+        y = self.y + DY[self.direction]
+        if 0 <= x < COLUMNS and 0 <= y < len(self.code):
+            self.x = x
+            self.y = y
+            self.instruction = self.code[y][x]
             return True
 
         self.error = "moved out of bounds"
@@ -160,14 +293,52 @@ class ArghInterpreter:
             self.error = "tried to pop from an empty stack"
             return
 
-        if not self._move():
-            self.error = "jumped out of bounds"
-            return
+        target = self.stack[-1]
+        dx = DX[self.direction]
+        dy = DY[self.direction]
 
-        while self.instruction != self.stack[-1]:
-            if not self._move():
-                self.error = "jumped out of bounds"
+        # Horizontal jumps search the row array directly in C
+        if dy == 0:
+            row = self.code[self.y]
+            try:
+                if dx > 0:
+                    self.x = row.index(target, self.x + 1)
+                else:
+                    self.x -= row[: self.x][::-1].index(target) + 1
+                self.instruction = target
                 return
+            except ValueError:
+                # Stop at the edge, as if the pointer had moved cell by cell
+                self.x = len(row) - 1 if dx > 0 else 0
+                self.instruction = row[self.x]
+
+        # Vertical jumps search the rows holding the symbol in this column,
+        # which are found once and kept until a put changes them
+        else:
+            column = self._column_symbols.setdefault(self.x, {})
+            ys = column.get(target)
+            if ys is None:
+                x = self.x
+                ys = [y for y, row in enumerate(self.code) if row[x] == target]
+                column[target] = ys
+            if dy > 0:
+                i = bisect_right(ys, self.y)
+                if i < len(ys):
+                    self.y = ys[i]
+                    self.instruction = target
+                    return
+                # Stop at the edge, as if the pointer had moved cell by cell
+                self.y = len(self.code) - 1
+            else:
+                i = bisect_left(ys, self.y)
+                if i > 0:
+                    self.y = ys[i - 1]
+                    self.instruction = target
+                    return
+                self.y = 0
+            self.instruction = self.code[self.y][self.x]
+
+        self.error = "jumped out of bounds"
 
     def _print(self, char: int, batch: bool = False) -> None:
         """
@@ -175,15 +346,18 @@ class ArghInterpreter:
 
         Errors when trying to print an unprintable character.
         """
-        if is_chr(char):
-            self.stdout += chr(char)
-            if batch:
-                print(chr(char), end="")
-        else:
+        if not is_chr(char):
             self.error = (
                 "tried to print unprintable character: "
                 f"{to_printable(char)}"
             )
+            return
+
+        string = chr(char)
+        self._stdout_parts.append(string)
+        self._stdout_cache = None
+        if batch:
+            print(string, end="")
 
     def input_char(self, char: int) -> None:
         """
@@ -200,8 +374,9 @@ class ArghInterpreter:
 
         To be called externally.
         """
-        for char in string:
-            self.input_char(ord(char))
+        if string:
+            self.stdin.extend(map(ord, string))
+            self.needs_input = False
 
     def _delete(self) -> None:
         """
@@ -225,202 +400,328 @@ class ArghInterpreter:
         else:
             self.error = "tried to pop from an empty stack"
 
-    def _add(self, addend: int) -> None:
-        """
-        Add the given value to the top value of the stack.
+    def _set_left(self) -> None:
+        """Set direction to left."""
+        self.direction = DIRECTION_LEFT
+
+    def _set_right(self) -> None:
+        """Set direction to right."""
+        self.direction = DIRECTION_RIGHT
+
+    def _set_up(self) -> None:
+        """Set direction to up."""
+        self.direction = DIRECTION_UP
+
+    def _set_down(self) -> None:
+        """Set direction to down."""
+        self.direction = DIRECTION_DOWN
+
+    def _jump_left(self) -> None:
+        """Jump left."""
+        self.direction = DIRECTION_LEFT
+        self._jump()
+
+    def _jump_right(self) -> None:
+        """Jump right."""
+        self.direction = DIRECTION_RIGHT
+        self._jump()
+
+    def _jump_up(self) -> None:
+        """Jump up."""
+        self.direction = DIRECTION_UP
+        self._jump()
+
+    def _jump_down(self) -> None:
+        """Jump down."""
+        self.direction = DIRECTION_DOWN
+        self._jump()
+
+    # The instruction pointer is always in bounds, so the handlers below only
+    # check the row they read or write. Reads fail like get() at the edges,
+    # and writes past the edges are ignored like put().
+
+    def _print_above(self) -> None:
+        """Print above."""
+        assert self.y > 0
+        self._print(self.code[self.y - 1][self.x], self._batch)
+
+    def _print_below(self) -> None:
+        """Print below."""
+        assert self.y + 1 < len(self.code)
+        self._print(self.code[self.y + 1][self.x], self._batch)
+
+    def _input_above(self) -> None:
+        """Input above (blocks if input is not available)."""
+        if self.stdin:
+            char = self.stdin.popleft()
+            if self.y > 0:
+                self._store(char, self.x, self.y - 1)
+        else:
+            self.needs_input = True
+
+    def _input_below(self) -> None:
+        """Input below (blocks if input is not available)."""
+        if self.stdin:
+            char = self.stdin.popleft()
+            if self.y + 1 < len(self.code):
+                self._store(char, self.x, self.y + 1)
+        else:
+            self.needs_input = True
 
-        Errors if the stack is empty.
-        """
+    def _eof_above(self) -> None:
+        """Put EOF in the cell above."""
+        if self.y > 0:
+            self._store(EOT, self.x, self.y - 1)
+
+    def _eof_below(self) -> None:
+        """Put EOF in the cell below."""
+        if self.y + 1 < len(self.code):
+            self._store(EOT, self.x, self.y + 1)
+
+    def _pop_above(self) -> None:
+        """Pop above."""
         if self.stack:
-            self.stack[-1] = self.stack[-1] + addend
+            value = self.stack.pop()
+            if self.y > 0:
+                self._store(value, self.x, self.y - 1)
         else:
             self.error = "tried to pop from an empty stack"
 
-    def _subtract(self, subtrahend: int) -> None:
-        """
-        Subtract the given value from the top value of the stack.
+    def _pop_below(self) -> None:
+        """Pop below."""
+        if self.stack:
+            value = self.stack.pop()
+            if self.y + 1 < len(self.code):
+                self._store(value, self.x, self.y + 1)
+        else:
+            self.error = "tried to pop from an empty stack"
 
-        Errors if the stack is empty.
-        """
+    def _add_above(self) -> None:
+        """Add the above value to the top value of the stack."""
+        assert self.y > 0
         if self.stack:
-            self.stack[-1] = self.stack[-1] - subtrahend
+            self.stack[-1] += self.code[self.y - 1][self.x]
         else:
             self.error = "tried to pop from an empty stack"
 
-    def _rotate(self, clockwise: bool) -> None:
-        """Rotates the current direction 90 degrees."""
-        swap = self.dx
-        self.dx = self.dy
-        self.dy = swap
+    def _add_below(self) -> None:
+        """Add the below value to the top value of the stack."""
+        assert self.y + 1 < len(self.code)
+        if self.stack:
+            self.stack[-1] += self.code[self.y + 1][self.x]
+        else:
+            self.error = "tried to pop from an empty stack"
 
-        if clockwise:
-            self.dx = -self.dx
+    def _subtract_above(self) -> None:
+        """Subtract the above value from the top value of the stack."""
+        assert self.y > 0
+        if self.stack:
+            self.stack[-1] -= self.code[self.y - 1][self.x]
+        else:
+            self.error = "tried to pop from an empty stack"
+
+    def _subtract_below(self) -> None:
+        """Subtract the below value from the top value of the stack."""
+        assert self.y + 1 < len(self.code)
+        if self.stack:
+            self.stack[-1] -= self.code[self.y + 1][self.x]
+        else:
+            self.error = "tried to pop from an empty stack"
+
+    def _push_above(self) -> None:
+        """Push above."""
+        assert self.y > 0
+        self.stack.append(self.code[self.y - 1][self.x])
+
+    def _push_below(self) -> None:
+        """Push below."""
+        assert self.y + 1 < len(self.code)
+        self.stack.append(self.code[self.y + 1][self.x])
+
+    def _turn_left_if_negative(self) -> None:
+        """Turn counter-clockwise if the top value of the stack is negative."""
+        if self.stack:
+            if self.stack[-1] < 0:
+                self.direction = COUNTERCLOCKWISE[self.direction]
+        else:
+            self.error = "tried to pop from an empty stack"
+
+    def _turn_right_if_positive(self) -> None:
+        """Turn clockwise if the top value of the stack is positive."""
+        if self.stack:
+            if self.stack[-1] > 0:
+                self.direction = CLOCKWISE[self.direction]
         else:
-            self.dy = -self.dy
+            self.error = "tried to pop from an empty stack"
+
+    def _shebang(self) -> None:
+        """Behave as "j" if the character to the right is a "!"."""
+        if self.x == 0 and self.y == 0 and self.get(1, 0) == _BANG:
+            self.direction = DIRECTION_DOWN
+        else:
+            self.error = "invalid instruction: #"
+
+    # Handlers for each instruction, keyed by symbol ("q" is never executed)
+    _DISPATCH: dict[int, Callable[["ArghInterpreter"], None]] = {
+        ord("h"): _set_left,
+        ord("l"): _set_right,
+        ord("k"): _set_up,
+        ord("j"): _set_down,
+        ord("H"): _jump_left,
+        ord("L"): _jump_right,
+        ord("K"): _jump_up,
+        ord("J"): _jump_down,
+        ord("P"): _print_above,
+        ord("p"): _print_below,
+        ord("G"): _input_above,
+        ord("g"): _input_below,
+        ord("D"): _delete,
+        ord("d"): _duplicate,
+        ord("E"): _eof_above,
+        ord("e"): _eof_below,
+        ord("F"): _pop_above,
+        ord("f"): _pop_below,
+        ord("A"): _add_above,
+        ord("a"): _add_below,
+        ord("R"): _subtract_above,
+        ord("r"): _subtract_below,
+        ord("S"): _push_above,
+        ord("s"): _push_below,
+        ord("X"): _turn_left_if_negative,
+        ord("x"): _turn_right_if_positive,
+        ord("#"): _shebang,
+    }
 
     def step(self, batch: bool = False) -> None:
         """
         Performs one step of execution if the program is not blocked.
 
         Will print to the system's standard output in batch mode. Errors in
-        various cases (see specific instruction comments).
+        various cases (see specific instruction handlers).
         """
         if self.blocked:
             return
 
-        # Parse the instruction to a character for easier handling
-        instruction_int = self.instruction
-        if not is_printable(instruction_int):
-            self.error = (
-                f"invalid instruction: {to_printable(instruction_int)}"
-            )
-        instruction = chr(instruction_int)
-
-        # Set direction to left
-        if instruction == "h":
-            self.dx, self.dy = -1, 0
-
-        # Set direction to right
-        elif instruction == "l":
-            self.dx, self.dy = 1, 0
-
-        # Set direction to up
-        elif instruction == "k":
-            self.dx, self.dy = 0, -1
-
-        # Set direction to down
-        elif instruction == "j":
-            self.dx, self.dy = 0, 1
-
-        # Jump left
-        elif instruction == "H":
-            self.dx, self.dy = -1, 0
-            self._jump()
-
-        # Jump right
-        elif instruction == "L":
-            self.dx, self.dy = 1, 0
-            self._jump()
-
-        # Jump up
-        elif instruction == "K":
-            self.dx, self.dy = 0, -1
-            self._jump()
-
-        # Jump down
-        elif instruction == "J":
-            self.dx, self.dy = 0, 1
-            self._jump()
-
-        # Print above
-        elif instruction == "P":
-            self._print(self._get_above(), batch)
-
-        # Print below
-        elif instruction == "p":
-            self._print(self._get_below(), batch)
-
-        # Input above (blocks if input is not available)
-        elif instruction == "G":
-            if len(self.stdin) > 0:
-                self._put_above(self.stdin.popleft())
-            else:
-                self.needs_input = True
-
-        # Input below (blocks if input is not available)
-        elif instruction == "g":
-            if len(self.stdin) > 0:
-                self._put_below(self.stdin.popleft())
-            else:
-                self.needs_input = True
-
-        # Delete the top value from the stack
-        elif instruction == "D":
-            self._delete()
-
-        # Duplicate the top value of the stack
-        elif instruction == "d":
-            self._duplicate()
-
-        # Put EOF in the cell above
-        elif instruction == "E":
-            self._put_above(EOT)
-
-        # Put EOF in the cell below
-        elif instruction == "e":
-            self._put_below(EOT)
-
-        # Pop above
-        elif instruction == "F":
-            if self.stack:
-                self._put_above(self.stack.pop())
-            else:
-                self.error = "tried to pop from an empty stack"
-
-        # Pop below
-        elif instruction == "f":
-            if self.stack:
-                self._put_below(self.stack.pop())
-            else:
-                self.error = "tried to pop from an empty stack"
-
-        # Add the above value to the top value of the stack
-        elif instruction == "A":
-            self._add(self._get_above())
-
-        # Add the below value to the top value of the stack
-        elif instruction == "a":
-            self._add(self._get_below())
-
-        # Subtract the above value from the top value of the stack
-        elif instruction == "R":
-            self._subtract(self._get_above())
+        instruction = self.instruction
+        handler = None
+        if 0 <= instruction < _DISPATCH_SIZE:
+            handler = self._dispatch[instruction]
+        if handler is None:
+            self.error = f"invalid instruction: {to_printable(instruction)}"
+            return
 
-        # Subtract the below value from the top value of the stack
-        elif instruction == "r":
-            self._subtract(self._get_below())
+        self._batch = batch
+        handler()
 
-        # Push above
-        elif instruction == "S":
-            self.stack.append(self._get_above())
+        # Move the instruction pointer if execution is not blocked
+        if (
+            self.error is None
+            and not self.needs_input
+            and self.instruction != _QUIT
+        ):
+            self._move()
 
-        # Push below
-        elif instruction == "s":
-            self.stack.append(self._get_below())
+    def run(
+        self, batch: bool = False, max_steps: Optional[int] = None
+    ) -> None:
+        """
+        Performs steps of execution until the program is blocked.
+
+        Stops early after max_steps steps, if given. Equivalent to calling
+        step() in a loop, but resolves the dispatch table and code once,
+        checks for blocking directly rather than through the blocked
+        property, and executes movement symbols and pointer moves inline.
+        Straight runs of the same movement symbol are walked over without
+        executing each symbol, though every cell still counts as a step.
+        """
+        if self.blocked:
+            return
 
-        # Turn clockwise if the top value of the stack is negative
-        elif instruction == "X":
-            if self.stack:
-                if self.stack[-1] < 0:
-                    self._rotate(clockwise=False)
-            else:
-                self.error = "tried to pop from an empty stack"
+        self._batch = batch
+        code = self.code
+        rows = len(code)
+        dispatch = self._dispatch
+        movement = _MOVEMENT
+        steps = count() if max_steps is None else iter(range(max_steps))
+        for _ in steps:
+            instruction = self.instruction
+
+            # Movement never blocks, so it skips the handler call and checks
+            direction = movement.get(instruction)
+            if direction is not None:
+                self.direction = direction
+
+                # Further copies of the symbol in this direction only keep
+                # the same direction, so walk over them without executing
+                # each one, still taking a step for each
+                dx = DX[direction]
+                dy = DY[direction]
+                x = self.x + dx
+                y = self.y + dy
+                if dy == 0:
+                    row = code[y]
+                    while (
+                        0 <= x < COLUMNS
+                        and row[x] == instruction
+                        and next(steps, None) is not None
+                    ):
+                        x += dx
+                else:
+                    while (
+                        0 <= y < rows
+                        and code[y][x] == instruction
+                        and next(steps, None) is not None
+                    ):
+                        y += dy
+                if not (0 <= x < COLUMNS and 0 <= y < rows):
+                    self.x = x - dx
+                    self.y = y - dy
+                    self._move()
+                    return
+                self.x = x
+                self.y = y
+                instruction = code[y][x]
+                self.instruction = instruction
+                if instruction == _QUIT:
+                    return
+                continue
+
+            handler = None
+            if 0 <= instruction < _DISPATCH_SIZE:
+                handler = dispatch[instruction]
+            if handler is None:
+                self.error = (
+                    f"invalid instruction: {to_printable(instruction)}"
+                )
+                return
 
-        # Turn counter-clockwise if the top value of the stack is positive
-        elif instruction == "x":
-            if self.stack:
-                if self.stack[-1] > 0:
-                    self._rotate(clockwise=True)
-            else:
-                self.error = "tried to pop from an empty stack"
-
-        # Behave as "j" if the character to the right is a "!"
-        elif (
-            instruction == "#"
-            and self.x == 0
-            and self.y == 0
-            and self.get(1, 0) == ord("!")
-        ):
-            self.dx, self.dy = 0, 1
+            handler()
 
-        # If the symbol is not any above instruction or "q", raise an error
-        elif instruction != "q":
-            # Invalid instruction
-            self.error = f"invalid instruction: {instruction}"
+            # Stop without moving if the instruction blocked execution
+            if (
+                self.error is not None
+                or self.needs_input
+                or self.instruction == _QUIT
+            ):
+                return
 
-        # Move the instruction pointer if execution is not blocked
-        if not self.blocked:
-            self._move()
+            # Move, leaving the error cases to _move()
+            direction = self.direction
+            x = self.x + DX[direction]
+            y = self.y + DY[direction]
+            if (
+                direction == DIRECTION_NONE
+                or not 0 <= x < COLUMNS
+                or not 0 <= y < rows
+            ):
+                self._move()
+                return
+            self.x = x
+            self.y = y
+            instruction = code[y][x]
+            self.instruction = instruction
+            if instruction == _QUIT:
+                return
 
     def new_line(self) -> None:
         """
@@ -428,13 +729,9 @@ class ArghInterpreter:
 
         For use in the editor.
         """
-        self.code.append([ord(" ")] * COLUMNS)
+        self.code.append(_BLANK_ROW[:])
+        self._column_symbols = {}
 
     def code_to_string(self) -> list[str]:
         """Convert the code to a list of strings for exporting."""
-        code = []
-        for y in range(len(self.code)):
-            code.append("")
-            for x in range(len(self.code[y])):
-                code[y] += chr(self.code[y][x])
-        return code
+        return ["".join(map(chr, row)) for row in self.code]
@@ -19,7 +19,7 @@ def batch_main(args: argparse.Namespace):
     interpreter = ArghInterpreter(read_lines(args.src.name))
     eof = False
     while not interpreter.done and not interpreter.error:
-        interpreter.step(batch=True)
+        interpreter.run(batch=True)
         if interpreter.needs_input:
             # Allow EOF to be entered only once
             if eof: